@@ -1,22 +1,28 @@
 import argparse
 import base64
 import datetime
+import hashlib
 import json
+import multiprocessing
 import os
 import re
 import select
+import selectors
 import sys
 import termios
 import threading
 import time
 import tty
 import unicodedata
-from collections.abc import Callable
-from io import TextIOWrapper
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO, StringIO, TextIOWrapper
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    import fitz
     import httpx
 from dotenv import load_dotenv
 
@@ -33,6 +39,32 @@ STREAM_CHUNK_TIMEOUT = int(os.getenv("STREAM_CHUNK_TIMEOUT", "300"))
 MAX_CONSECUTIVE_ERRORS = int(os.getenv("MAX_CONSECUTIVE_ERRORS", "3"))
 MAX_TOKENS = int(os.getenv("MAX_TOKENS", "4096"))
 DEBUG = os.getenv("DEBUG", "false").strip().lower() in {"1", "true", "yes"}
+# Formato con el que se envían las páginas al LLM: JPEG (por defecto) o PNG sin pérdida
+IMAGE_FORMAT = "png" if os.getenv("IMAGE_FORMAT", "jpeg").strip().lower() == "png" else "jpeg"
+JPEG_QUALITY = int(os.getenv("JPEG_QUALITY", "85"))
+# Páginas que se envían juntas en cada petición al LLM (>1 solo si el modelo lo soporta)
+PAGES_PER_REQUEST = max(1, int(os.getenv("PAGES_PER_REQUEST", "1")))
+# Peticiones al LLM en paralelo (subirlo solo si el servidor atiende varias a la vez)
+LLM_CONCURRENCY = max(1, int(os.getenv("LLM_CONCURRENCY", "1")))
+# PDFs/directorios que se procesan a la vez (cada uno con hasta LLM_CONCURRENCY peticiones)
+FILE_CONCURRENCY = max(1, int(os.getenv("FILE_CONCURRENCY", "1")))
+# HTTP/2 directo (sin negociar) también con http://: las peticiones en paralelo comparten
+# una sola conexión. Solo para servidores que aceptan HTTP/2 en claro (h2c)
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "false").strip().lower() in {"1", "true", "yes"}
+# Caché en disco de las respuestas del LLM (misma imagen + modelo + prompt → mismo texto)
+LLM_CACHE = os.getenv("LLM_CACHE", "true").strip().lower() in {"1", "true", "yes"}
+LLM_CACHE_DIR = Path(os.getenv("LLM_CACHE_DIR", "./cache"))
+# Páginas que se renderizan por adelantado mientras el LLM procesa la actual
+N_PREFETCH = 2
+# Páginas terminadas que se acumulan antes de escribirlas juntas en el Markdown
+_FLUSH_PAGES = 10
+# Vacía la caché de MuPDF tras cada página (menos memoria con PDFs escaneados grandes)
+LOW_MEM = os.getenv("LOW_MEM", "false").strip().lower() in {"1", "true", "yes"}
+
+# Expresiones regulares precompiladas
+_SLUG_RE = re.compile(r'[<>:"/\\|?*\s]+')  # caracteres inválidos en nombres de archivo y espacios
+_META_RE = re.compile(r"^---[ \t]*\n.*?---[ \t]*(?:\n|$)", re.DOTALL)  # bloque de metadatos inicial
+_PAGE_RE = re.compile(r"^## Página (\d+)", re.MULTILINE)  # encabezados de página del Markdown
 
 
 def _fetch_models() -> tuple[list[str], str | None]:
@@ -44,13 +76,13 @@ def _fetch_models() -> tuple[list[str], str | None]:
     # Chat completions usa /v1/... pero models usa /api/v1/... (LM Studio)
     try:
         base = LLM_BASE_URL.rsplit("/v1", 1)[0] + "/api/v1"
-        resp = _httpx().get(f"{base}/models", timeout=5)
+        resp = _http_client().get(f"{base}/models", timeout=5)
         resp.raise_for_status()
     except Exception:
         return [], None
 
     try:
-        data = resp.json()
+        data = _json_loads(resp.content)
     except (json.JSONDecodeError, KeyError):
         return [], None
 
@@ -99,6 +131,101 @@ def _httpx():
 _httpx._mod = None  # type: ignore[attr-defined]
 
 
+def _http_client() -> "httpx.Client":
+    """Devuelve el cliente httpx compartido, creándolo la primera vez.
+
+    Un único cliente mantiene las conexiones abiertas entre páginas (keep-alive)
+    y usa HTTP/2 cuando el servidor lo negocia. Para cancelar una petición se
+    cierra su respuesta, no el cliente.
+
+    Se crea al consultar los modelos (_fetch_models), de modo que la primera
+    página ya encuentra la conexión establecida.
+    """
+    if _http_client._client is None:
+        httpx = _httpx()
+        _http_client._client = httpx.Client(
+            transport=httpx.HTTPTransport(
+                http1=not LLM_HTTP2,
+                http2=True,
+                # Tantas conexiones reutilizables como peticiones en paralelo (por proyecto y
+                # proyectos a la vez), más margen para las cancelaciones y la consulta de
+                # modelos; con HTTP/2 todas van multiplexadas en una
+                limits=httpx.Limits(
+                    max_connections=FILE_CONCURRENCY * LLM_CONCURRENCY + 4,
+                    max_keepalive_connections=max(4, FILE_CONCURRENCY * LLM_CONCURRENCY),
+                ),
+                # Solo reintenta fallos al conectar: la petición aún no ha llegado al servidor
+                retries=3,
+            ),
+            # Sin límite de lectura por defecto (las peticiones al LLM fijan el suyo a partir
+            # de STREAM_CHUNK_TIMEOUT), pero sin quedarse colgado si el servidor no acepta la conexión
+            timeout=httpx.Timeout(None, connect=10),
+        )
+    return _http_client._client
+
+
+_http_client._client = None  # type: ignore[attr-defined]
+
+
+def _pil_image():
+    """Devuelve el módulo PIL.Image (Pillow), importándolo la primera vez."""
+    if _pil_image._mod is None:
+        from PIL import Image as _mod  # type: ignore[import]
+        _pil_image._mod = _mod
+    return _pil_image._mod
+
+
+_pil_image._mod = None  # type: ignore[attr-defined]
+
+
+def _pil_imageops():
+    """Devuelve el módulo PIL.ImageOps (Pillow), importándolo la primera vez."""
+    if _pil_imageops._mod is None:
+        from PIL import ImageOps as _mod  # type: ignore[import]
+        _pil_imageops._mod = _mod
+    return _pil_imageops._mod
+
+
+_pil_imageops._mod = None  # type: ignore[attr-defined]
+
+try:
+    import pybase64 as _pybase64  # base64 vectorizado (AVX2/AVX-512)
+except ImportError:
+    _pybase64 = None
+
+
+try:
+    import orjson as _orjson  # parser JSON en C que acepta bytes directamente
+except ImportError:
+    _orjson = None
+
+
+def _json_loads(data: bytes | bytearray | memoryview):
+    """Decodifica JSON desde bytes (con orjson si está disponible).
+
+    orjson.JSONDecodeError hereda de json.JSONDecodeError, así que los llamadores
+    pueden capturar siempre json.JSONDecodeError.
+    """
+    if _orjson is not None:
+        return _orjson.loads(data)
+    # json.loads no acepta memoryview
+    return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+def _json_dumps(obj) -> bytes:
+    """Serializa obj a JSON compacto en UTF-8 (con orjson si está disponible)."""
+    if _orjson is not None:
+        return _orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _b64encode(data: bytes | memoryview) -> bytes:
+    """Codifica data en base64 (con pybase64 si está disponible)."""
+    if _pybase64 is not None:
+        return _pybase64.b64encode(data)
+    return base64.b64encode(data)
+
+
 class _TeeWriter:
     """Duplica la escritura a la consola original y a un fichero de log.
 
@@ -110,6 +237,8 @@ class _TeeWriter:
         self._console = console
         self._log_file = log_file
         self._log_line_buf = ""
+        # Con FILE_CONCURRENCY > 1 escriben varios hilos a la vez sobre el mismo buffer
+        self._lock = threading.Lock()
 
     # ── API mínima compatible con sys.stdout ──────────────────────────────
     @property
@@ -123,16 +252,17 @@ class _TeeWriter:
         return self._console.isatty()
 
     def write(self, s: str) -> int:
-        # Consola: escribir tal cual (los \r sobreescriben la línea visualmente)
-        self._console.write(s)
-        # Fichero de log: acumular en buffer y volcar líneas completas
-        self._log_line_buf += s
-        while "\n" in self._log_line_buf:
-            line, self._log_line_buf = self._log_line_buf.split("\n", 1)
-            # Si la línea tiene \r, quedarse solo con la parte tras el último \r
-            if "\r" in line:
-                line = line.rsplit("\r", 1)[-1]
-            self._log_file.write(line + "\n")
+        with self._lock:
+            # Consola: escribir tal cual (los \r sobreescriben la línea visualmente)
+            self._console.write(s)
+            # Fichero de log: acumular en buffer y volcar líneas completas
+            self._log_line_buf += s
+            while "\n" in self._log_line_buf:
+                line, self._log_line_buf = self._log_line_buf.split("\n", 1)
+                # Si la línea tiene \r, quedarse solo con la parte tras el último \r
+                if "\r" in line:
+                    line = line.rsplit("\r", 1)[-1]
+                self._log_file.write(line + "\n")
         return len(s)
 
     def flush(self) -> None:
@@ -151,11 +281,23 @@ class _TeeWriter:
         self._log_file.close()
 
 
+# print() escribe el texto y el final de línea por separado: con varios proyectos a la
+# vez (FILE_CONCURRENCY > 1) las líneas de distintos hilos podrían quedar pegadas
+_print_lock = threading.Lock()
+
+
+def _print(*args, **kwargs) -> None:
+    """print() sin mezclarse con los de otros hilos: cada llamada sale entera."""
+    with _print_lock:
+        print(*args, **kwargs)
+
+
 # Flag compartido: se activa cuando el usuario pulsa Escape
 stop_requested = threading.Event()
-# Flag compartido: se activa cuando el usuario pulsa S/s (saltar página actual)
+# Flag compartido: se activa cuando el usuario pulsa S/s sin ninguna petición en curso;
+# la siguiente petición que empiece lo consume y se da por saltada
 skip_page_requested = threading.Event()
-# Flag interno: señal para que el hilo listener termine sin que el usuario haya pulsado Escape
+# Flag interno: señal para que los hilos listener y ticker terminen al acabar el procesamiento
 _listener_exit = threading.Event()
 
 # Contadores globales de tokens (thread-safe gracias al GIL para operaciones simples)
@@ -163,31 +305,31 @@ _total_prompt_tokens: int = 0
 _total_completion_tokens: int = 0
 _tokens_lock = threading.Lock()
 
-# Estado de la petición LLM en curso (accedido desde el listener de teclado y call_llm)
-_current_http_client: "httpx.Client | None" = None
-_current_generation_id: str | None = None
-_current_lock = threading.Lock()
+# Peticiones LLM en curso, en orden de envío (accedido desde el listener de teclado y
+# call_llm_batch). Cada una es un dict con "response", "generation_id", "skipped" y "owner".
+_in_flight: list[dict] = []
+_in_flight_lock = threading.Lock()
 
 
 class SkipPageError(Exception):
     """Se lanza cuando el usuario pulsa S/s para saltar la página actual."""
 
 
-def _cancel_current_request() -> None:
-    """Interrumpe la petición LLM en curso cerrando el socket y notificando al servidor."""
-    with _current_lock:
-        client = _current_http_client
-        generation_id = _current_generation_id
+def _cancel_request(request: dict) -> None:
+    """Interrumpe una petición LLM cerrando su respuesta y notificando al servidor."""
+    with _in_flight_lock:
+        response = request["response"]
+        generation_id = request["generation_id"]
 
-    if client is not None:
+    if response is not None:
         try:
-            client.close()
+            response.close()
         except Exception:
             pass
 
     if generation_id is not None:
         try:
-            _httpx().post(
+            _http_client().post(
                 f"{LLM_BASE_URL}/chat/completions/{generation_id}/cancel",
                 headers={"Authorization": "Bearer lm-studio"},
                 timeout=5,
@@ -196,27 +338,64 @@ def _cancel_current_request() -> None:
             pass
 
 
-def _keyboard_listener() -> None:
-    """Hilo que espera la tecla Escape sin poner el terminal en modo raw."""
+def _skip_current_request() -> None:
+    """Salta la petición en curso más antigua (la de la página que se está esperando).
+
+    Si no hay ninguna en curso, deja skip_page_requested activo para la siguiente.
+    """
+    with _in_flight_lock:
+        if not _in_flight:
+            skip_page_requested.set()
+            return
+        request = _in_flight[0]
+        request["skipped"] = True
+    _cancel_request(request)
+
+
+def _cancel_all_requests(skip: bool = False, owner: object = None) -> None:
+    """Interrumpe todas las peticiones LLM en curso (o solo las de owner, si se indica).
+
+    Con skip=True además se marcan como saltadas, para que las que aún están
+    enviando la imagen desistan en cuanto reciban la respuesta.
+    """
+    with _in_flight_lock:
+        pending = [r for r in _in_flight if owner is None or r["owner"] is owner]
+        if skip:
+            for request in pending:
+                request["skipped"] = True
+    for request in pending:
+        _cancel_request(request)
+
+
+def _keyboard_listener(wake_fd: int) -> None:
+    """Hilo que espera la tecla Escape sin poner el terminal en modo raw.
+
+    wake_fd es el extremo de lectura de un pipe: al escribir en el otro extremo
+    el hilo despierta y termina, así que no necesita despertarse periódicamente.
+    """
     fd = sys.stdin.fileno()
     old_settings = termios.tcgetattr(fd)
+    selector = selectors.DefaultSelector()
+    selector.register(sys.stdin, selectors.EVENT_READ)
+    selector.register(wake_fd, selectors.EVENT_READ)
     try:
         tty.setcbreak(fd)  # cbreak: entrega caracteres de uno en uno pero mantiene \r\n intactos
         while not _listener_exit.is_set():
-            # Esperar hasta 200 ms para no bloquear indefinidamente
-            ready, _, _ = select.select([sys.stdin], [], [], 0.2)
-            if ready:
+            # Bloquear sin plazo hasta que llegue una tecla o la señal de terminar
+            for key, _ in selector.select():
+                if key.fd == wake_fd:
+                    return
                 ch = sys.stdin.read(1)
                 if ch == "\x1b":  # tecla Escape
-                    print("\n\n  [Escape] Deteniendo el proceso...")
+                    _print("\n\n  [Escape] Deteniendo el proceso...")
                     stop_requested.set()
-                    _cancel_current_request()
+                    _cancel_all_requests()
                     return
                 if ch in ("s", "S"):  # tecla S: saltar la página actual
-                    print("\n\n  [S] Saltando la página actual...")
-                    skip_page_requested.set()
-                    _cancel_current_request()
+                    _print("\n\n  [S] Saltando la página actual...")
+                    _skip_current_request()
     finally:
+        selector.close()
         termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
 
 
@@ -226,6 +405,49 @@ def _fmt(seconds: float) -> str:
     return f"{m:02d}:{s:02d}"
 
 
+# Página en curso cuya línea de progreso refresca _status_ticker (None si no hay ninguna)
+_status_label: str | None = None
+_status_start: float = 0.0
+_status_lock = threading.Lock()
+
+
+def _status_begin(label: str) -> float:
+    """Imprime 'label — llamando al LLM...' y lo deja a cargo del ticker.
+
+    Devuelve el instante de inicio (time.monotonic()) para medir la página.
+    Con FILE_CONCURRENCY > 1 no hay línea de progreso (las de varios proyectos se
+    pisarían entre sí): cada página solo imprime su línea final.
+    """
+    global _status_label, _status_start
+    if FILE_CONCURRENCY > 1:
+        return time.monotonic()
+    _print(f"  {label} — llamando al LLM...", end="", flush=True)
+    with _status_lock:
+        _status_label = label
+        _status_start = time.monotonic()
+        return _status_start
+
+
+def _status_end() -> None:
+    """Detiene el refresco de la línea de progreso de la página en curso."""
+    global _status_label
+    with _status_lock:
+        _status_label = None
+
+
+def _status_ticker() -> None:
+    """Hilo único que refresca cada segundo el tiempo transcurrido de la página en curso.
+
+    Se imprime con _status_lock tomado para que, una vez que _status_end() retorna,
+    ninguna actualización atrasada pise la línea final de la página.
+    """
+    while not _listener_exit.wait(timeout=1.0):
+        with _status_lock:
+            if _status_label is not None:
+                elapsed = time.monotonic() - _status_start
+                _print(f"\r  {_status_label} — llamando al LLM... {_fmt(elapsed)}", end="", flush=True)
+
+
 def _print_banner() -> None:
     print(r"""
   ██╗     ██╗     ███╗   ███╗       ██████╗  ██████╗██████╗
@@ -243,36 +465,177 @@ def slugify(text: str) -> str:
     Conserva caracteres no ASCII (kanji, hiragana, katakana, etc.) y solo
     reemplaza los caracteres que son inválidos o problemáticos en nombres de archivo.
     """
-    # Normalizar a forma NFC para consistencia sin eliminar caracteres no ASCII
-    text = unicodedata.normalize("NFC", text)
+    # Normalizar a forma NFC para consistencia sin eliminar caracteres no ASCII.
+    # Un texto ASCII ya está en NFC (str.isascii no recorre la cadena)
+    if not text.isascii():
+        text = unicodedata.normalize("NFC", text)
     # Reemplazar caracteres inválidos en nombres de archivo y espacios por guion bajo
     # Se conservan letras, dígitos, guiones, puntos y cualquier carácter unicode de palabra (incluye CJK)
-    text = re.sub(r'[<>:"/\\|?*\s]+', "_", text)
+    text = _SLUG_RE.sub("_", text)
     # Eliminar guiones bajos al inicio y al final
     text = text.strip("_")
     return text
 
 
-def call_llm(image_bytes: bytes) -> tuple[str, int, int]:
-    """Envía una imagen en bytes al LLM en base64 usando streaming SSE y devuelve el texto.
+# Marcador que ocupa el lugar de cada imagen al serializar el payload
+_IMAGE_PLACEHOLDER = "__IMAGE__"
+# Separador que el modelo escribe entre páginas cuando recibe varias en una petición
+_PAGE_BREAK = "---PAGE_BREAK---"
+
+
+# Trozo de imagen que se codifica cada vez; múltiplo de 3 para que los trozos
+# en base64 se puedan concatenar sin relleno intermedio
+_B64_CHUNK = 48 * 1024
+
 
-    Devuelve (texto, prompt_tokens, completion_tokens).
-    Lanza TimeoutError si la petición completa tarda más de STREAM_CHUNK_TIMEOUT segundos.
+def _encode_payload(payload: dict, images: list[bytes]) -> tuple[Iterator[bytes], int]:
+    """Serializa payload a JSON con cada imagen en base64 en lugar de su _IMAGE_PLACEHOLDER.
+
+    Devuelve (trozos, longitud_total). El base64 se genera trozo a trozo mientras
+    httpx envía el cuerpo, así que nunca hay una copia completa de una imagen
+    codificada en memoria; _json_dumps solo serializa el resto del payload.
     """
-    image_data = base64.b64encode(image_bytes).decode("utf-8")
+    body = _json_dumps(payload)
+    # Fragmentos JSON entre imágenes: uno más que imágenes
+    fragments = body.split(_IMAGE_PLACEHOLDER.encode("ascii"))
+    length = sum(map(len, fragments)) + sum(4 * ((len(image) + 2) // 3) for image in images)
 
-    payload = {
-        "model": LLM_MODEL,
-        "stream": True,
-        "stream_options": {"include_usage": True},
-        "max_tokens": MAX_TOKENS,
-        "messages": [
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": """
+    def _chunks() -> Iterator[bytes]:
+        yield fragments[0]
+        for image, fragment in zip(images, fragments[1:]):
+            view = memoryview(image)
+            for start in range(0, len(view), _B64_CHUNK):
+                yield _b64encode(view[start:start + _B64_CHUNK])
+            yield fragment
+
+    return _chunks(), length
+
+
+def _iter_sse_data(chunks: Iterable[bytes]) -> Iterator[memoryview]:
+    """Devuelve el contenido de cada línea 'data:' de un flujo SSE, sin decodificarlo.
+
+    Trabaja directamente sobre los bytes recibidos: acumula en un bytearray y
+    corta por saltos de línea con find(), en lugar de decodificar y partir cada
+    línea como hace iter_lines(). Se corta por línea y no por evento (b"\\n\\n")
+    para tolerar servidores que terminan las líneas con \\r\\n.
+
+    Cada valor es un memoryview sobre el buffer interno, sin copiar los bytes:
+    solo es válido hasta pedir el siguiente (se libera antes de reutilizar el buffer).
+    """
+    buf = bytearray()
+    for chunk in chunks:
+        buf += chunk
+        start = 0
+        with memoryview(buf) as view:
+            while (end := buf.find(b"\n", start)) != -1:
+                if buf.startswith(b"data:", start, end):
+                    # Quitar el espacio opcional tras "data:" y el \r final ajustando índices
+                    value_start = start + len(b"data:")
+                    if buf.startswith(b" ", value_start, end):
+                        value_start += 1
+                    value_end = end - 1 if buf.startswith(b"\r", end - 1, end) else end
+                    with view[value_start:value_end] as data:
+                        yield data
+                start = end + 1
+        del buf[:start]
+
+
+# Aciertos y fallos de la caché de respuestas en esta ejecución
+_cache_hits: int = 0
+_cache_misses: int = 0
+_cache_lock = threading.Lock()
+
+
+def _cache_key(content: list[dict], images: list[bytes]) -> str:
+    """Clave de la caché: hash BLAKE2b del modelo, el prompt y las imágenes."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(LLM_MODEL.encode("utf-8"))
+    h.update(_json_dumps(content))  # prompt y formato de las imágenes
+    for image in images:
+        h.update(len(image).to_bytes(8, "little"))
+        h.update(image)
+    return h.hexdigest()
+
+
+def _source_identity(path: Path, st: os.stat_result | None = None) -> str:
+    """Identidad de un fichero de origen para la caché: ruta, tamaño y fecha de modificación."""
+    st = st or path.stat()
+    return f"{path.resolve()}\0{st.st_size}\0{st.st_mtime_ns}"
+
+
+def _page_cache_base(source_id: str) -> hashlib.blake2b:
+    """Parte común de las claves de página de un proyecto, calculada una sola vez.
+
+    Combina la identidad del origen (source_id), los ajustes de renderizado, el
+    modelo y el prompt: si nada de eso ha cambiado, la imagen que se enviaría al
+    LLM para una misma página sería la misma.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"{source_id}\0{MAX_LONG_SIDE}\0{IMAGE_FORMAT}\0{JPEG_QUALITY}\0{LLM_MODEL}".encode("utf-8"))
+    h.update(_json_dumps(_llm_content(1)))
+    return h
+
+
+def _page_cache_key(base: hashlib.blake2b, page_id: str) -> str:
+    """Clave de la caché para una página, calculada sin renderizarla, a partir de _page_cache_base."""
+    h = base.copy()
+    h.update(b"\0" + page_id.encode("utf-8"))
+    return h.hexdigest()
+
+
+def _cache_path(key: str) -> Path:
+    """Ruta del fichero de caché, repartido en subdirectorios por los dos primeros caracteres."""
+    return LLM_CACHE_DIR / key[:2] / f"{key[2:]}.json"
+
+
+def _cache_get(key: str, count_miss: bool = True) -> str | None:
+    """Devuelve el texto guardado para key, o None si no está en la caché.
+
+    Con count_miss=False un fallo no cuenta en las estadísticas (consulta previa a la
+    de la respuesta completa, que ya lo contará si tampoco está).
+    """
+    global _cache_hits, _cache_misses
+    try:
+        text = _json_loads(_cache_path(key).read_bytes())["text"]
+    except (OSError, json.JSONDecodeError, KeyError, TypeError):
+        text = None
+    with _cache_lock:
+        if text is None:
+            if count_miss:
+                _cache_misses += 1
+        else:
+            _cache_hits += 1
+    return text
+
+
+def _cache_put(key: str, text: str) -> None:
+    """Guarda el texto de una respuesta completa; un fallo al escribir no es grave."""
+    path = _cache_path(key)
+    # Temporal propio de cada hilo: con LLM_CONCURRENCY > 1 puede haber escrituras simultáneas
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_bytes(_json_dumps({"model": LLM_MODEL, "text": text}))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _cache_put_pages(page_keys: list[str] | None, texts: list[str]) -> None:
+    """Guarda el texto ya limpio de cada página bajo su clave de _page_cache_key."""
+    for key, text in zip(page_keys or (), texts):
+        _cache_put(key, text)
+
+
+def _llm_content(n_images: int) -> list[dict]:
+    """Contenido del mensaje para el LLM: el prompt y un hueco por imagen.
+
+    Las imágenes van como _IMAGE_PLACEHOLDER; _encode_payload las sustituye al enviar.
+    """
+    content: list[dict] = [
+        {
+            "type": "text",
+            "text": """
                             Eres un motor de extracción y formateo de documentos. Analiza la imagen proporcionada (un documento escrito con párrafos, tablas, imágenes y diagramas) y devuelve ÚNICAMENTE el contenido en formato Markdown válido, respetando estrictamente la estructura visual y jerárquica original de la página.
 
                             🔹 Reglas de procesamiento:
@@ -286,26 +649,117 @@ def call_llm(image_bytes: bytes) -> tuple[str, int, int]:
                             6. **Idioma:** Conserva el idioma original del documento. Si es ambiguo, traduce al castellano (español de España) de forma natural.
 
                             Procede con la conversión ahora.
-                        """
-                    },
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": f"data:image/png;base64,{image_data}"},
-                    }
-                ],
+                        """,
+        },
+    ]
+    if n_images > 1:
+        content.append({
+            "type": "text",
+            "text": f"Recibirás {n_images} imágenes, una por página y en orden. Procesa cada página "
+                    f"por separado y escribe una línea que contenga únicamente `{_PAGE_BREAK}` "
+                    f"entre el resultado de una página y el de la siguiente.",
+        })
+    for _ in range(n_images):
+        content.append({
+            "type": "image_url",
+            "image_url": {"url": f"data:image/{IMAGE_FORMAT};base64,{_IMAGE_PLACEHOLDER}"},
+        })
+    return content
+
+
+def call_llm(image_bytes: bytes, owner: object = None,
+             page_key: str | None = None) -> tuple[str, int, int]:
+    """Envía una imagen en bytes al LLM y devuelve (texto, prompt_tokens, completion_tokens)."""
+    texts, prompt_tokens, completion_tokens = call_llm_batch(
+        [image_bytes], owner, [page_key] if page_key else None)
+    return texts[0], prompt_tokens, completion_tokens
+
+
+def _call_llm_group(images: list[bytes], owner: object = None,
+                    page_keys: list[str] | None = None) -> tuple[list[str], int, int]:
+    """Como call_llm_batch, pero si el modelo no separa bien las páginas las repite una a una.
+
+    Así un lote mal formado no se pierde entero: cada página vuelve a pedirse por
+    separado (y queda en la caché de respuestas de forma individual).
+    """
+    try:
+        return call_llm_batch(images, owner, page_keys)
+    except ValueError as e:
+        if len(images) == 1:
+            raise
+        _print(f"\n  [lote] {e}. Repitiendo las páginas una a una...", flush=True)
+
+    texts: list[str] = []
+    prompt_tokens = completion_tokens = 0
+    for i, image in enumerate(images):
+        text, pt, ct = call_llm(image, owner, page_keys[i] if page_keys else None)
+        texts.append(text)
+        prompt_tokens += pt
+        completion_tokens += ct
+    return texts, prompt_tokens, completion_tokens
+
+
+def call_llm_batch(images: list[bytes], owner: object = None,
+                   page_keys: list[str] | None = None) -> tuple[list[str], int, int]:
+    """Envía una o varias imágenes al LLM en base64 usando streaming SSE y devuelve sus textos.
+
+    Con varias imágenes se pide al modelo que separe cada página con _PAGE_BREAK y
+    la respuesta se parte por ese separador.
+
+    Devuelve (textos, prompt_tokens, completion_tokens), un texto por imagen.
+    owner identifica al proyecto que hace la petición, para poder cancelar solo las suyas.
+    Con LLM_CACHE activo, una respuesta ya guardada se devuelve sin llamar al LLM
+    (y sin consumir tokens); page_keys (una clave de _page_cache_key por imagen) guarda
+    además el texto de cada página para no tener que renderizarla la próxima vez.
+    Lanza TimeoutError si la petición completa tarda más de STREAM_CHUNK_TIMEOUT segundos
+    y ValueError si el modelo no devuelve tantos bloques como imágenes.
+    """
+    content = _llm_content(len(images))
+
+    payload = {
+        "model": LLM_MODEL,
+        "stream": True,
+        "stream_options": {"include_usage": True},
+        "max_tokens": MAX_TOKENS * len(images),  # presupuesto por página
+        "messages": [
+            {
+                "role": "user",
+                "content": content,
             }
         ],
     }
 
-    result: dict = {"text": None, "error": None, "generation_id": None,
+    cache_key = _cache_key(content, images) if LLM_CACHE else None
+    cached = _cache_get(cache_key) if cache_key else None
+    if cached is not None:
+        texts = _split_pages(cached, len(images))
+        _cache_put_pages(page_keys, texts)
+        return texts, 0, 0
+
+    result: dict = {"text": None, "error": None, "generation_id": None, "finish_reason": None,
                     "prompt_tokens": 0, "completion_tokens": 0}
-    # Cliente httpx compartido: cerrarlo desde el hilo principal interrumpe el socket
-    http_client = _httpx().Client(timeout=None)
 
-    global _current_http_client, _current_generation_id
-    with _current_lock:
-        _current_http_client = http_client
-        _current_generation_id = None
+    # Registrar la petición para que el listener de teclado pueda cancelarla
+    # cancelled: abandonada por superar STREAM_CHUNK_TIMEOUT (el hilo debe desistir sin más)
+    request: dict = {"response": None, "generation_id": None, "skipped": False, "cancelled": False,
+                     "owner": owner}
+    with _in_flight_lock:
+        if skip_page_requested.is_set():
+            # S pulsada entre páginas: esta petición es la que se salta
+            skip_page_requested.clear()
+            request["skipped"] = True
+        _in_flight.append(request)
+
+    def _abandoned() -> bool:
+        return stop_requested.is_set() or request["skipped"] or request["cancelled"]
+
+    def _upload(chunks: Iterator[bytes]) -> Iterator[bytes]:
+        # Dejar de enviar la imagen en cuanto la petición se abandona: InterruptedError
+        # es un OSError y _do_request lo recoge como error (ya ignorado por el llamador)
+        for chunk in chunks:
+            if _abandoned():
+                raise InterruptedError("Petición abandonada mientras se enviaba")
+            yield chunk
 
     def _do_request() -> None:
         try:
@@ -314,29 +768,46 @@ def call_llm(image_bytes: bytes) -> tuple[str, int, int]:
             while True:
                 payload["max_tokens"] = current_max_tokens
                 finish_reason: str | None = None
-                chunks = []
+                text_buf = StringIO()
+                body, body_length = _encode_payload(payload, images)
 
-                with http_client.stream(
+                with _http_client().stream(
                     "POST",
                     f"{LLM_BASE_URL}/chat/completions",
-                    json=payload,
-                    headers={"Authorization": "Bearer lm-studio"},
+                    content=_upload(body),
+                    headers={
+                        "Authorization": "Bearer lm-studio",
+                        "Content-Type": "application/json",
+                        # Con la longitud conocida httpx no recurre a chunked encoding
+                        "Content-Length": str(body_length),
+                    },
+                    # Ninguna espera (hueco en el pool, envío, cabeceras o siguiente trozo)
+                    # puede durar más que la petición entera: si se abandona antes de tener
+                    # respuesta, la conexión vuelve al pool en vez de quedarse ocupada
+                    timeout=_httpx().Timeout(STREAM_CHUNK_TIMEOUT, connect=10),
                 ) as response:
+                    # Publicar la respuesta para que _cancel_request pueda cerrarla
+                    with _in_flight_lock:
+                        request["response"] = response
+                    if _abandoned():
+                        break  # cancelada mientras se enviaba la petición o se esperaba la respuesta
                     response.raise_for_status()
-                    for line in response.iter_lines():
-                        if not line.startswith("data:"):
-                            continue
-                        data_str = line[len("data:"):].strip()
+                    for data_bytes in _iter_sse_data(response.iter_bytes(chunk_size=8192)):
+                        if _abandoned():
+                            break
                         if DEBUG:
-                            print(f"\n  [DEBUG] {data_str}", flush=True)
-                        if data_str == "[DONE]":
+                            _print(f"\n  [DEBUG] {bytes(data_bytes).decode('utf-8', 'replace')}", flush=True)
+                        if data_bytes == b"[DONE]":
                             break
                         try:
-                            data = json.loads(data_str)
-                        except (json.JSONDecodeError, KeyError):
+                            data = _json_loads(data_bytes)
+                        except (json.JSONDecodeError, UnicodeDecodeError):
                             continue
                         if result["generation_id"] is None:
                             result["generation_id"] = data.get("id")
+                            # Publicarlo en cuanto llega para que se pueda cancelar en el servidor
+                            with _in_flight_lock:
+                                request["generation_id"] = result["generation_id"]
                         # Capturar estadísticas de uso de tokens
                         usage = data.get("usage")
                         if usage:
@@ -346,7 +817,7 @@ def call_llm(image_bytes: bytes) -> tuple[str, int, int]:
                         delta = choice.get("delta", {})
                         content = delta.get("content")
                         if content:
-                            chunks.append(content)
+                            text_buf.write(content)
                         if choice.get("finish_reason"):
                             finish_reason = choice["finish_reason"]
 
@@ -356,47 +827,41 @@ def call_llm(image_bytes: bytes) -> tuple[str, int, int]:
 
                 # El modelo cortó por límite de tokens: duplicar y reintentar
                 current_max_tokens *= 2
-                print(
+                _print(
                     f"\n  [tokens] Límite alcanzado ({current_max_tokens // 2} tokens). "
                     f"Reintentando con {current_max_tokens}...",
                     flush=True,
                 )
-                # Reiniciar el generation_id para que el hilo principal lo actualice
-                # con el id de la nueva petición
+                # Reiniciar el generation_id para publicar el de la nueva petición
                 result["generation_id"] = None
 
-            result["text"] = "".join(chunks)
-        except (_httpx().HTTPError, OSError) as exc:
+            result["text"] = text_buf.getvalue()
+            result["finish_reason"] = finish_reason
+        except (_httpx().HTTPError, _httpx().StreamError, OSError) as exc:
+            # StreamError: la respuesta se cerró desde otro hilo al cancelar
             result["error"] = exc
 
     thread = threading.Thread(target=_do_request, daemon=True)
     thread.start()
 
-    deadline = STREAM_CHUNK_TIMEOUT
-    while deadline > 0 and thread.is_alive():
-        thread.join(timeout=0.1)
-        deadline -= 0.1
-        # Propagar el generation_id al estado global en cuanto esté disponible
-        if result["generation_id"] is not None:
-            with _current_lock:
-                _current_generation_id = result["generation_id"]
-
-    if thread.is_alive():
-        _cancel_current_request()
-        raise TimeoutError(
-            f"La petición al LLM superó el límite de {STREAM_CHUNK_TIMEOUT}s sin completarse"
-        )
-
-    with _current_lock:
-        _current_http_client = None
-        _current_generation_id = None
     try:
-        http_client.close()
-    except OSError:
-        pass
+        thread.join(timeout=STREAM_CHUNK_TIMEOUT)
+
+        if thread.is_alive():
+            # Marcarla antes de cancelar: si la respuesta aún no existe (enviando el cuerpo
+            # o esperando las cabeceras), el hilo la descarta en cuanto se abra
+            with _in_flight_lock:
+                request["cancelled"] = True
+            _cancel_request(request)
+            raise TimeoutError(
+                f"La petición al LLM superó el límite de {STREAM_CHUNK_TIMEOUT}s sin completarse"
+            )
+    finally:
+        with _in_flight_lock:
+            _in_flight.remove(request)
 
     # Si la petición fue cancelada externamente (Escape o timeout ya gestionado), ignorar el error
-    if skip_page_requested.is_set():
+    if request["skipped"]:
         raise SkipPageError("Página saltada por el usuario")
     if stop_requested.is_set():
         raise InterruptedError("Petición cancelada por el usuario")
@@ -405,33 +870,116 @@ def call_llm(image_bytes: bytes) -> tuple[str, int, int]:
         raise result["error"]
 
     text = result["text"] or ""
+    texts = _split_pages(text, len(images))
+    if cache_key and result["finish_reason"] == "stop":
+        # Solo se guarda una respuesta terminada con normalidad y con tantas páginas como imágenes
+        _cache_put(cache_key, text)
+        _cache_put_pages(page_keys, texts)
+    return texts, result["prompt_tokens"], result["completion_tokens"]
 
-    # Eliminar el bloque de metadatos al inicio (delimitado por ---).
-    # Acepta espacios/tabuladores tras los delimitadores y bloque al final del texto.
-    text = re.sub(r"^---[ \t]*\n.*?---[ \t]*(?:\n|$)", "", text, flags=re.DOTALL)
-    text = text.strip()
 
-    # Si tras eliminar el bloque no queda contenido útil, devolver cadena vacía
+def _split_pages(text: str, n_images: int) -> list[str]:
+    """Parte la respuesta del LLM en un texto limpio por imagen.
+
+    Lanza ValueError si el modelo no devolvió tantos bloques como imágenes.
+    """
+    parts = text.split(_PAGE_BREAK) if n_images > 1 else [text]
+    if len(parts) == n_images + 1 and not parts[-1].strip():
+        parts.pop()  # separador sobrante tras la última página
+    if len(parts) != n_images:
+        raise ValueError(
+            f"El modelo devolvió {len(parts)} bloque(s) de texto para {n_images} imágenes"
+        )
+
+    # Eliminar el bloque de metadatos al inicio de cada página (delimitado por ---).
+    # Acepta espacios/tabuladores tras los delimitadores y bloque al final del texto.
+    # Si tras eliminar el bloque no queda contenido útil, queda cadena vacía
     # para que el llamador pueda decidir si escribe o no la página.
-    return text, result["prompt_tokens"], result["completion_tokens"]
+    return [_META_RE.sub("", part.lstrip()).strip() for part in parts]
+
+
+# Bytes del final del Markdown que se examinan para localizar la última página
+_TAIL_BYTES = 64 * 1024
 
 
 def get_last_processed_page(markdown_path: Path) -> int:
-    """Devuelve el número de la última página procesada en el Markdown, o 0 si no hay ninguna."""
-    content = markdown_path.read_text(encoding="utf-8")
-    matches = re.findall(r"^## Página (\d+)", content, flags=re.MULTILINE)
+    """Devuelve el número de la última página procesada en el Markdown, o 0 si no hay ninguna.
+
+    Las páginas se escriben en orden, así que basta con examinar el final del
+    fichero; si ahí no aparece ningún encabezado (una página enorme), se duplica
+    el tramo examinado hasta encontrarlo o llegar al principio.
+    """
+    with markdown_path.open("rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        window = _TAIL_BYTES
+        while True:
+            offset = max(0, size - window)
+            f.seek(offset)
+            tail = f.read().decode("utf-8", errors="ignore")
+            if offset > 0:
+                # Descartar la primera línea: puede estar cortada por la mitad
+                tail = tail.partition("\n")[2]
+            matches = _PAGE_RE.findall(tail)
+            if matches or offset == 0:
+                break
+            window *= 2
     if matches:
         return max(int(m) for m in matches)
     return 0
 
 
+def _state_path(markdown_path: Path) -> Path:
+    """Ruta del fichero de estado que acompaña al Markdown (<slug>.state.json)."""
+    return markdown_path.with_name(f"{markdown_path.stem}.state.json")
+
+
+def _write_state(markdown_path: Path, last_page: int, md_size: int, total_pages: int,
+                 source_stat: os.stat_result) -> None:
+    """Guarda la última página escrita, el tamaño del Markdown en ese momento y el total de páginas.
+
+    También anota el tamaño y la fecha de modificación del fichero de origen
+    (source_stat), para reconocer si después se sustituye por otro.
+    Se escribe en un temporal y se renombra con os.replace para que una
+    interrupción nunca deje el fichero de estado a medias.
+    """
+    state_path = _state_path(markdown_path)
+    tmp_path = state_path.with_name(state_path.name + ".tmp")
+    state = {"last_page": last_page, "md_size": md_size, "total_pages": total_pages,
+             "source_size": source_stat.st_size, "source_mtime_ns": source_stat.st_mtime_ns}
+    tmp_path.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp_path, state_path)
+
+
+def _read_state(markdown_path: Path) -> dict | None:
+    """Devuelve el estado guardado junto al Markdown, o None si falta o no es fiable.
+
+    El estado solo se usa si el Markdown mide exactamente lo que se anotó al
+    guardarlo (no se ha editado a mano ni quedó a medias).
+    """
+    try:
+        state = _json_loads(_state_path(markdown_path).read_bytes())
+        if state["md_size"] == markdown_path.stat().st_size:
+            return state
+    except (OSError, json.JSONDecodeError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _resume_page(markdown_path: Path) -> int:
+    """Devuelve la última página procesada, del fichero de estado o examinando el Markdown."""
+    state = _read_state(markdown_path)
+    if state is not None:
+        return int(state["last_page"])
+    return get_last_processed_page(markdown_path)
+
+
 def get_missing_pages(markdown_path: Path) -> list[int]:
     """Devuelve lista (1-based) de páginas que faltan en el rango [1, max_found].
 
     Solo busca huecos dentro del rango ya procesado, no las páginas pendientes al final.
     """
     content = markdown_path.read_text(encoding="utf-8")
-    found = {int(m) for m in re.findall(r"^## Página (\d+)", content, flags=re.MULTILINE)}
+    found = {int(m) for m in _PAGE_RE.findall(content)}
     if not found:
         return []
     max_found = max(found)
@@ -447,10 +995,9 @@ def _insert_page_into_markdown(markdown_path: Path, page_number: int, text: str)
     content = markdown_path.read_text(encoding="utf-8")
 
     # Localizar la posición del primer '## Página M' con M > page_number
-    pattern = re.compile(r"^(## Página (\d+))", re.MULTILINE)
     insert_pos: int | None = None
-    for m in pattern.finditer(content):
-        if int(m.group(2)) > page_number:
+    for m in _PAGE_RE.finditer(content):
+        if int(m.group(1)) > page_number:
             insert_pos = m.start()
             break
 
@@ -467,87 +1014,108 @@ def _insert_page_into_markdown(markdown_path: Path, page_number: int, text: str)
 
 def _process_pages(
     title: str,
+    source: Path,
     markdown_path: Path,
     total_pages: int,
     start_page: int,
     file_mode: str,
-    get_image_bytes: Callable[[int], bytes],
+    submit_render: Callable[[int], Future[bytes]],
+    page_key: Callable[[int], str] | None = None,
 ) -> float:
     """Bucle común de procesado de páginas: llama al LLM y escribe el Markdown.
 
-    get_image_bytes(page_number) debe devolver los bytes PNG de la página indicada.
+    submit_render(page_number) debe lanzar el renderizado de la página indicada y
+    devolver un Future con la imagen codificada. En ambas fases se mantienen
+    N_PREFETCH páginas renderizándose por adelantado mientras se espera al LLM.
+
+    page_key(page_number), si se indica, da la clave de caché de la página sin
+    renderizarla: los grupos cuyas páginas ya están todas en la caché no se
+    renderizan ni se envían al LLM.
+
+    source es el PDF o directorio de origen, cuya identidad se anota en el estado.
 
     Si el fichero ya existía (file_mode == "a"), primero intenta recuperar las páginas
     hueco (omitidas por errores en ejecuciones previas) e insertarlas en su posición.
     """
     page_times: list[float] = []
     error_pages: list[int] = []
+    # Con varios proyectos a la vez, cada línea de progreso indica a cuál pertenece
+    prefix = f"[{title}] " if FILE_CONCURRENCY > 1 else ""
+    source_stat = source.stat()
     global _total_prompt_tokens, _total_completion_tokens
 
     # ── Fase 1: recuperar páginas hueco ──────────────────────────────────────
     if file_mode == "a":
         missing = get_missing_pages(markdown_path)
         if missing:
-            print(f"\n  Páginas hueco detectadas: {missing}")
-            print("  Intentando recuperarlas antes de continuar...\n")
+            _print(f"\n  Páginas hueco detectadas: {missing}")
+            _print("  Intentando recuperarlas antes de continuar...\n")
             recovered = 0
-            for page_num in list(missing):
+            # Claves y textos ya guardados de cada hueco (caché por página): no se renderizan
+            gap_keys = {page_num: page_key(page_num - 1) for page_num in missing} if page_key else {}
+            gap_known: dict[int, str] = {}
+            for page_num, key in gap_keys.items():
+                text = _cache_get(key, count_miss=False)
+                if text is not None:
+                    gap_known[page_num] = text
+            # Renders de huecos en curso, igual que en la fase principal
+            gap_renders: deque[Future[bytes]] = deque()
+            next_gap = 0
+            for i, page_num in enumerate(missing):
                 if stop_requested.is_set():
                     break
-                page_number = page_num - 1  # convertir a 0-based
-
-                t_start = time.monotonic()
-                done_event = threading.Event()
-
-                def _display_timer_gap(pn: int = page_num) -> None:
-                    while not done_event.wait(timeout=1.0):
-                        elapsed_time = time.monotonic() - t_start
-                        print(
-                            f"\r  [hueco] Página {pn}/{total_pages} — llamando al LLM... {_fmt(elapsed_time)}",
-                            end="", flush=True,
-                        )
+                while next_gap < len(missing) and next_gap <= i + N_PREFETCH:
+                    if missing[next_gap] not in gap_known:
+                        gap_renders.append(submit_render(missing[next_gap] - 1))  # 0-based
+                    next_gap += 1
+
+                label = f"{prefix}[hueco] Página {page_num}/{total_pages}"
+                if page_num in gap_known:
+                    recovered += 1
+                    _print(f"  {label} — OK (caché)")
+                    _insert_page_into_markdown(markdown_path, page_num, gap_known[page_num])
+                    _write_state(markdown_path, start_page, markdown_path.stat().st_size, total_pages, source_stat)
+                    continue
 
-                image_bytes = get_image_bytes(page_number)
+                image_bytes = gap_renders.popleft().result()
                 text = ""
-                print(f"  [hueco] Página {page_num}/{total_pages} — llamando al LLM...", end="", flush=True)
-                timer_thread = threading.Thread(target=_display_timer_gap, daemon=True)
-                timer_thread.start()
+                t_start = _status_begin(label)
 
                 try:
-                    text, pt, ct = call_llm(image_bytes)
+                    text, pt, ct = call_llm(image_bytes, markdown_path, gap_keys.get(page_num))
                     with _tokens_lock:
                         _total_prompt_tokens += pt
                         _total_completion_tokens += ct
                 except SkipPageError:
                     elapsed = time.monotonic() - t_start
-                    done_event.set()
-                    timer_thread.join()
-                    skip_page_requested.clear()
-                    print(f"\r  [hueco] Página {page_num}/{total_pages} — OMITIDA ({_fmt(elapsed)})")
+                    _status_end()
+                    _print(f"\r  {label} — OMITIDA ({_fmt(elapsed)})")
                     _insert_page_into_markdown(markdown_path, page_num, "Página omitida.")
+                    _write_state(markdown_path, start_page, markdown_path.stat().st_size, total_pages, source_stat)
                     continue
                 except InterruptedError:
-                    done_event.set()
-                    timer_thread.join()
+                    _status_end()
                     break
                 except (TimeoutError, OSError, Exception) as e:
                     elapsed = time.monotonic() - t_start
-                    done_event.set()
-                    timer_thread.join()
-                    print(f"\r  [hueco] Página {page_num}/{total_pages} — ERROR ({_fmt(elapsed)}) — {e}")
+                    _status_end()
+                    _print(f"\r  {label} — ERROR ({_fmt(elapsed)}) — {e}")
                     error_pages.append(page_num)
                     continue
                 finally:
-                    done_event.set()
+                    _status_end()
+                    del image_bytes  # no esperar a que la sustituya la siguiente página
 
                 elapsed = time.monotonic() - t_start
                 page_times.append(elapsed)
                 recovered += 1
-                print(f"\r  [hueco] Página {page_num}/{total_pages} — OK ({_fmt(elapsed)})")
+                _print(f"\r  {label} — OK ({_fmt(elapsed)})")
                 _insert_page_into_markdown(markdown_path, page_num, text)
+                # Un hueco nunca supera la última página: solo cambia el tamaño
+                _write_state(markdown_path, start_page, markdown_path.stat().st_size, total_pages, source_stat)
 
             if recovered:
-                print(f"\n  {recovered} página(s) hueco recuperada(s).\n")
+                _print(f"\n  {recovered} página(s) hueco recuperada(s).\n")
 
     # ── Fase 2: bucle principal (páginas nuevas desde start_page) ────────────
     with markdown_path.open(file_mode if file_mode == "w" else "a", encoding="utf-8") as md_file:
@@ -555,122 +1123,331 @@ def _process_pages(
             md_file.write(f"# {title}\n\n")
 
         consecutive_errors = 0
+        # Renders en curso, en orden de página, por delante de la página actual
+        prefetched: deque[Future[bytes]] = deque()
+        next_render = start_page
+        # Grupos de páginas (0-based) que viajan juntos en la misma petición al LLM
+        groups = [range(g, min(g + PAGES_PER_REQUEST, total_pages))
+                  for g in range(start_page, total_pages, PAGES_PER_REQUEST)]
+        next_group = 0
+        # Claves y textos ya guardados de cada página pendiente (caché por página)
+        page_keys = {n: page_key(n) for n in range(start_page, total_pages)} if page_key else {}
+        known: dict[int, str] = {}
+        for page_number, key in page_keys.items():
+            text = _cache_get(key, count_miss=False)
+            if text is not None:
+                known[page_number] = text
+        # Peticiones enviadas y aún sin escribir, en orden de página: se escriben
+        # en ese orden para que el Markdown quede siempre ordenado y reanudable
+        pending: deque[tuple[range, Future[tuple[list[str], int, int]] | None]] = deque()
+        llm_pool = ThreadPoolExecutor(max_workers=LLM_CONCURRENCY)
+
+        # Bloques de páginas terminadas aún sin escribir. Se vuelcan de una vez cada
+        # _FLUSH_PAGES páginas y al salir, de modo que el fichero siempre acaba en una
+        # página completa; si el proceso muere se repiten como mucho esas páginas
+        unwritten: list[str] = []
+        last_queued = start_page
+        # Páginas servidas por la caché por página: no cuentan para la media ni el estimado
+        cached_pages = 0
+
+        def flush_pages() -> None:
+            if unwritten:
+                md_file.write("".join(unwritten))
+                unwritten.clear()
+            md_file.flush()
+            _write_state(markdown_path, last_queued, os.fstat(md_file.fileno()).st_size, total_pages, source_stat)
+
+        def queue_pages(group: range, texts: list[str]) -> None:
+            nonlocal last_queued
+            for page_number, text in zip(group, texts):
+                if text:
+                    unwritten.append(f"## Página {page_number + 1}\n\n{text}\n\n")
+                else:
+                    unwritten.append(f"## Página {page_number + 1}\n\nSin contenido.\n\n")
+                    _print(f"  {prefix}Página {page_number + 1}/{total_pages} — sin contenido.")
+            last_queued = group[-1] + 1
+            if len(unwritten) >= _FLUSH_PAGES:
+                flush_pages()
 
-        for page_number in range(start_page, total_pages):
-            if stop_requested.is_set():
-                break
-
-            image_bytes = get_image_bytes(page_number)
-
-            t_start = time.monotonic()
-            done_event = threading.Event()
+        try:
+            while True:
+                # Mantener hasta LLM_CONCURRENCY peticiones en curso
+                while next_group < len(groups) and len(pending) < LLM_CONCURRENCY:
+                    if stop_requested.is_set():
+                        break
+                    group = groups[next_group]
+                    next_group += 1
+                    while next_render < total_pages and next_render <= group[-1] + N_PREFETCH:
+                        # Solo se renderizan los grupos que no están enteros en la caché
+                        ahead = groups[(next_render - start_page) // PAGES_PER_REQUEST]
+                        if not all(n in known for n in ahead):
+                            prefetched.append(submit_render(next_render))
+                        next_render += 1
+                    if all(n in known for n in group):
+                        pending.append((group, None))  # servido por la caché por página
+                        continue
+                    images = [prefetched.popleft().result() for _ in group]
+                    keys = [page_keys[n] for n in group] if page_keys else None
+                    pending.append((group, llm_pool.submit(_call_llm_group, images, markdown_path, keys)))
+                    # Desde aquí solo la petición referencia las imágenes: se liberan al terminar
+                    del images
+                if not pending:
+                    break
 
-            def _display_timer(pn: int = page_number) -> None:
-                while not done_event.wait(timeout=1.0):
-                    elapsed_time = time.monotonic() - t_start
-                    print(f"\r  Página {pn + 1}/{total_pages} — llamando al LLM... {_fmt(elapsed_time)}",
-                          end="", flush=True)
+                group, future = pending.popleft()
+                if len(group) == 1:
+                    label = f"{prefix}Página {group[0] + 1}/{total_pages}"
+                else:
+                    label = f"{prefix}Páginas {group[0] + 1}-{group[-1] + 1}/{total_pages}"
+                if future is None:
+                    _print(f"  {label} — OK (caché)")
+                    cached_pages += len(group)
+                    queue_pages(group, [known[n] for n in group])
+                    continue
+                # Con varias peticiones en paralelo se mide desde que se empieza a esperar
+                # esta, así la suma de tiempos sigue siendo el tiempo real transcurrido
+                t_start = _status_begin(label)
 
-            print(f"  Página {page_number + 1}/{total_pages} — llamando al LLM...", end="", flush=True)
-            timer_thread = threading.Thread(target=_display_timer, daemon=True)
-            timer_thread.start()
+                try:
+                    texts, pt, ct = future.result()
+                    with _tokens_lock:
+                        _total_prompt_tokens += pt
+                        _total_completion_tokens += ct
+                    consecutive_errors = 0
+                except SkipPageError:
+                    elapsed = time.monotonic() - t_start
+                    _status_end()
+                    _print(f"\r  {label} — OMITIDA ({_fmt(elapsed)})")
+                    for page_number in group:
+                        unwritten.append(f"## Página {page_number + 1}\n\nPágina omitida.\n\n")
+                    last_queued = group[-1] + 1
+                    if len(unwritten) >= _FLUSH_PAGES:
+                        flush_pages()
+                    continue
+                except InterruptedError:
+                    _status_end()
+                    break
+                except (TimeoutError, OSError, Exception) as e:
+                    elapsed = time.monotonic() - t_start
+                    _status_end()
+                    consecutive_errors += 1
+                    error_pages.extend(page_number + 1 for page_number in group)
+                    _print(f"\r  {label} — ERROR ({_fmt(elapsed)}) — {e}")
+                    if consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+                        _print(f"\n  {MAX_CONSECUTIVE_ERRORS} errores consecutivos. Deteniendo el proceso...")
+                        break
+                    continue
+                finally:
+                    _status_end()
 
-            try:
-                text, pt, ct = call_llm(image_bytes)
-                with _tokens_lock:
-                    _total_prompt_tokens += pt
-                    _total_completion_tokens += ct
-                consecutive_errors = 0
-            except SkipPageError:
                 elapsed = time.monotonic() - t_start
-                done_event.set()
-                timer_thread.join()
-                skip_page_requested.clear()
-                print(f"\r  Página {page_number + 1}/{total_pages} — OMITIDA ({_fmt(elapsed)})")
-                md_file.write(f"## Página {page_number + 1}\n\nPágina omitida.\n\n")
-                md_file.flush()
-                continue
-            except InterruptedError:
-                done_event.set()
-                timer_thread.join()
-                break
-            except (TimeoutError, OSError, Exception) as e:
-                elapsed = time.monotonic() - t_start
-                done_event.set()
-                timer_thread.join()
-                consecutive_errors += 1
-                error_pages.append(page_number + 1)
-                print(f"\r  Página {page_number + 1}/{total_pages} — ERROR ({_fmt(elapsed)}) — {e}")
-                if consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
-                    print(f"\n  {MAX_CONSECUTIVE_ERRORS} errores consecutivos. Deteniendo el proceso...")
-                    break
-                continue
-            finally:
-                done_event.set()
-
-            elapsed = time.monotonic() - t_start
-            page_times.append(elapsed)
-
-            pages_done = len(page_times)
-            pages_left = total_pages - (start_page + pages_done)
-            avg = sum(page_times) / pages_done
-            eta = avg * pages_left
-
-            print(f"\r  Página {page_number + 1}/{total_pages} — OK ({_fmt(elapsed)}) — "
-                  f"media {_fmt(avg)}/pág — estimado restante: {_fmt(eta)}")
-
-            if text:
-                md_file.write(f"## Página {page_number + 1}\n\n{text}\n\n")
-            else:
-                md_file.write(f"## Página {page_number + 1}\n\nSin contenido.\n\n")
-                print(f"  Página {page_number + 1}/{total_pages} — sin contenido.")
-            md_file.flush()
+                # Repartir el tiempo de la petición entre sus páginas para la media y el total
+                page_times.extend([elapsed / len(group)] * len(group))
 
-    pages_processed = len(page_times)
-    print(f"\n  {pages_processed} página(s) procesada(s) correctamente.")
+                pages_done = len(page_times)
+                pages_left = total_pages - (start_page + pages_done + cached_pages)
+                avg = sum(page_times) / pages_done
+                eta = avg * pages_left
+
+                _print(f"\r  {label} — OK ({_fmt(elapsed)}) — "
+                      f"media {_fmt(avg)}/pág — estimado restante: {_fmt(eta)}")
+                queue_pages(group, texts)
+        finally:
+            if pending:
+                # Se sale antes de tiempo: abandonar las peticiones que quedan en curso
+                _cancel_all_requests(skip=True, owner=markdown_path)
+            llm_pool.shutdown(wait=True, cancel_futures=True)
+            flush_pages()
+
+    pages_processed = len(page_times) + cached_pages
+    _print(f"\n  {pages_processed} página(s) procesada(s) correctamente.")
     if error_pages:
-        print(f"  {len(error_pages)} página(s) no procesada(s) por error: {error_pages}")
-    print()
+        _print(f"  {len(error_pages)} página(s) no procesada(s) por error: {error_pages}")
+    _print()
     return sum(page_times)
 
 
+def _render_workers() -> int:
+    """Número de procesos para renderizar páginas (como máximo 4)."""
+    return min(os.cpu_count() or 1, 4)
+
+
+# Documento abierto en cada proceso del pool de renderizado (ver _render_worker_init)
+_worker_doc = None
+# Matrices de escalado ya calculadas en el proceso, por tamaño de página y lado largo:
+# en un libro escaneado todas las páginas suelen medir lo mismo
+_mat_cache: dict[tuple[float, float, int], "fitz.Matrix"] = {}
+
+
+def _render_worker_init(pdf_path_str: str) -> None:
+    """Abre el PDF una sola vez por proceso del pool de renderizado.
+
+    Los Document de PyMuPDF no se pueden serializar, así que cada proceso abre
+    el suyo al arrancar y lo reutiliza en todas sus páginas (sin reabrir el
+    fichero y con la caché de MuPDF caliente).
+    """
+    global _worker_doc
+    _worker_doc = _fitz().open(pdf_path_str)
+
+
+def _render_page(page_number: int, max_long_side: int) -> bytes:
+    """Renderiza una página en IMAGE_FORMAT con el lado largo escalado a max_long_side.
+
+    Se ejecuta en un proceso del pool de renderizado sobre el documento abierto
+    por _render_worker_init.
+    """
+    fitz = _fitz()
+    page = _worker_doc[page_number]
+    rect = page.rect
+    key = (rect.width, rect.height, max_long_side)
+    mat = _mat_cache.get(key)
+    if mat is None:
+        # Aquí scale > 1 no es interpolar: la página se rasteriza a más resolución
+        # (un A4 mide 842 pt), así que se escala siempre a max_long_side
+        scale = max_long_side / max(rect.width, rect.height)
+        mat = _mat_cache[key] = fitz.Matrix(scale, scale)
+    pix = page.get_pixmap(matrix=mat, alpha=False)
+    if IMAGE_FORMAT == "jpeg":
+        data = pix.tobytes("jpeg", jpg_quality=JPEG_QUALITY)
+    else:
+        data = pix.tobytes("png")
+    # Soltar ya el pixmap (muestras RGB sin comprimir) y la página, que mantiene vivos
+    # sus recursos en la caché de MuPDF y les impediría salir con store_shrink
+    del pix, page
+    if LOW_MEM:
+        # Cada página se renderiza una sola vez: las imágenes decodificadas que MuPDF
+        # guarda en su caché (hasta 256 MB por proceso) no se van a reutilizar
+        fitz.TOOLS.store_shrink(100)
+    return data
+
+
+def _to_8bit(img):
+    """Pasa a 8 bits (modo L) una imagen de 16 o 32 bits (modos I;16*, I y F).
+
+    convert() recorta los valores a 0-255, así que un PNG de 16 bits en escala de
+    grises (frecuente en escáneres) saldría casi blanco: antes se reescala.
+    """
+    if img.mode.startswith("I;16"):
+        img = img.convert("I")
+    lo, hi = img.getextrema()
+    if img.mode == "I" and 0 <= lo and hi <= 255:
+        scale, offset = 1.0, 0.0  # ya cabe en 8 bits
+    elif img.mode == "I" and 0 <= lo and hi <= 65535:
+        scale, offset = 1 / 256, 0.0  # rango de 16 bits: conservar la exposición
+    else:
+        # Rango arbitrario (32 bits o coma flotante): estirarlo a 0-255
+        scale = 255 / (hi - lo) if hi > lo else 0.0
+        offset = -lo * scale
+    return img.point(lambda v: v * scale + offset).convert("L")
+
+
+def _render_image(img_path_str: str, max_long_side: int) -> bytes:
+    """Reduce una imagen PNG/JPEG con Pillow y la devuelve en IMAGE_FORMAT.
+
+    Se ejecuta en un proceso del pool de renderizado. Para imágenes sueltas
+    Pillow evita el coste de abrir un documento MuPDF por cada fichero.
+    """
+    Image = _pil_image()
+    ImageOps = _pil_imageops()
+
+    with Image.open(img_path_str) as src:
+        # Si el fichero ya está en el formato de envío, cabe en max_long_side y no
+        # necesita girarse ni componerse sobre blanco, se envía tal cual: sin
+        # decodificar ni volver a comprimir (Image.open solo ha leído la cabecera)
+        if (
+            src.format == IMAGE_FORMAT.upper()
+            and max(src.size) <= max_long_side
+            and src.mode in ("RGB", "L")
+            and "transparency" not in src.info
+            and src.getexif().get(0x0112, 1) == 1  # orientación EXIF normal
+        ):
+            with open(img_path_str, "rb") as f:
+                return f.read()
+        img = ImageOps.exif_transpose(src)
+        if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+            # Componer sobre fondo blanco, igual que fitz con alpha=False
+            img = img.convert("RGBA")
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel("A"))
+            img = background
+        else:
+            if img.mode in ("I", "F") or img.mode.startswith("I;16"):
+                img = _to_8bit(img)
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+        # Solo se reduce: ampliar una imagen pequeña no mejora el OCR
+        img.thumbnail((max_long_side, max_long_side), Image.Resampling.LANCZOS)
+        buf = BytesIO()
+        if IMAGE_FORMAT == "jpeg":
+            img.save(buf, "JPEG", quality=JPEG_QUALITY)
+        else:
+            img.save(buf, "PNG", optimize=False)
+        return buf.getvalue()
+
+
 def convert_pdf_to_images(pdf_path: Path, output_base: Path) -> float:
-    """Convierte cada página de un PDF en una imagen PNG en memoria y la envía al LLM."""
+    """Convierte cada página de un PDF en una imagen en memoria y la envía al LLM."""
     slug = slugify(pdf_path.stem)
     markdown_path = output_base / f"{slug}.md"
 
+    # Atajo sin abrir el PDF (analizar un PDF escaneado grande es caro): el estado
+    # guarda su número de páginas y sigue valiendo mientras el PDF sea el mismo
+    # (mismo tamaño y misma fecha de modificación que al guardarlo)
+    state = _read_state(markdown_path) if markdown_path.exists() else None
+    pdf_stat = pdf_path.stat()
+    if (
+        state is not None
+        and "total_pages" in state
+        and state["last_page"] >= state["total_pages"]
+        and state.get("source_size") == pdf_stat.st_size
+        and state.get("source_mtime_ns") == pdf_stat.st_mtime_ns
+        and not get_missing_pages(markdown_path)
+    ):
+        _print(f"Saltando (ya completo): {pdf_path.name}  →  {markdown_path}\n")
+        return 0.0
+
     doc = _fitz().open(str(pdf_path))
     total_pages = len(doc)
 
     if markdown_path.exists():
-        last_page = get_last_processed_page(markdown_path)
+        last_page = _resume_page(markdown_path)
         if last_page >= total_pages and not get_missing_pages(markdown_path):
-            print(f"Saltando (ya completo): {pdf_path.name}  →  {markdown_path}\n")
+            _print(f"Saltando (ya completo): {pdf_path.name}  →  {markdown_path}\n")
             doc.close()
             return 0.0
         start_page = last_page
         file_mode = "a"
-        print(f"Modelo:     {LLM_MODEL}\n")
-        print(f"Reanudando: {output_base}/{pdf_path.name}")
-        print(f"Markdown:   {markdown_path}\n")
+        _print(f"Modelo:     {LLM_MODEL}\n")
+        _print(f"Reanudando: {output_base}/{pdf_path.name}")
+        _print(f"Markdown:   {markdown_path}\n")
     else:
         start_page = 0
         file_mode = "w"
-        print(f"Modelo:     {LLM_MODEL}\n")
-        print(f"Procesando: {output_base}/{pdf_path.name}")
-        print(f"Markdown:   {markdown_path}\n")
-
-    def get_image_bytes(page_number: int) -> bytes:
-        page = doc[page_number]
-        long_side = max(page.rect.width, page.rect.height)
-        scale = MAX_LONG_SIDE / long_side
-        mat = _fitz().Matrix(scale, scale)
-        pix = page.get_pixmap(matrix=mat, alpha=False)
-        return pix.tobytes("png")
-
-    elapsed = _process_pages(pdf_path.stem, markdown_path, total_pages, start_page, file_mode, get_image_bytes)
+        _print(f"Modelo:     {LLM_MODEL}\n")
+        _print(f"Procesando: {output_base}/{pdf_path.name}")
+        _print(f"Markdown:   {markdown_path}\n")
+
     doc.close()
-    return elapsed
+
+    executor = ProcessPoolExecutor(
+        max_workers=_render_workers(),
+        initializer=_render_worker_init,
+        initargs=(str(pdf_path),),
+    )
+    try:
+        def submit_render(page_number: int) -> Future[bytes]:
+            return executor.submit(_render_page, page_number, MAX_LONG_SIDE)
+
+        # La identidad del PDF no cambia entre páginas: se calcula una vez
+        page_base = _page_cache_base(_source_identity(pdf_path, pdf_stat))
+
+        def page_key(page_number: int) -> str:
+            return _page_cache_key(page_base, str(page_number))
+
+        return _process_pages(pdf_path.stem, pdf_path, markdown_path, total_pages, start_page, file_mode, submit_render,
+                              page_key if LLM_CACHE else None)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
 
 def process_image_dir(dir_path: Path, output_base: Path) -> float:
@@ -689,35 +1466,38 @@ def process_image_dir(dir_path: Path, output_base: Path) -> float:
     total_pages = len(image_files)
 
     if markdown_path.exists():
-        last_page = get_last_processed_page(markdown_path)
+        last_page = _resume_page(markdown_path)
         if last_page >= total_pages and not get_missing_pages(markdown_path):
-            print(f"Saltando (ya completo): {dir_path.name}/  →  {markdown_path}\n")
+            _print(f"Saltando (ya completo): {dir_path.name}/  →  {markdown_path}\n")
             return 0.0
         start_page = last_page
         file_mode = "a"
-        print(f"Modelo:     {LLM_MODEL}\n")
-        print(f"Reanudando: {output_base}/{dir_path.name}/")
-        print(f"Markdown:   {markdown_path}\n")
+        _print(f"Modelo:     {LLM_MODEL}\n")
+        _print(f"Reanudando: {output_base}/{dir_path.name}/")
+        _print(f"Markdown:   {markdown_path}\n")
     else:
         start_page = 0
         file_mode = "w"
-        print(f"Modelo:     {LLM_MODEL}\n")
-        print(f"Procesando: {output_base}/{dir_path.name}/")
-        print(f"Markdown:   {markdown_path}\n")
+        _print(f"Modelo:     {LLM_MODEL}\n")
+        _print(f"Procesando: {output_base}/{dir_path.name}/")
+        _print(f"Markdown:   {markdown_path}\n")
+
+    executor = ProcessPoolExecutor(max_workers=_render_workers())
+    try:
+        def submit_render(page_number: int) -> Future[bytes]:
+            # Reescalar para respetar MAX_LONG_SIDE igual que con los PDFs
+            return executor.submit(_render_image, str(image_files[page_number]), MAX_LONG_SIDE)
+
+        # Cada imagen es su propio fichero de origen: la página se identifica por él
+        page_base = _page_cache_base(str(dir_path.resolve()))
 
-    def get_image_bytes(page_number: int) -> bytes:
-        img_path = image_files[page_number]
-        # Reescalar con fitz para respetar MAX_LONG_SIDE igual que con los PDFs
-        doc = _fitz().open(str(img_path))
-        page = doc[0]
-        long_side = max(page.rect.width, page.rect.height)
-        scale = MAX_LONG_SIDE / long_side
-        mat = _fitz().Matrix(scale, scale)
-        pix = page.get_pixmap(matrix=mat, alpha=False)
-        doc.close()
-        return pix.tobytes("png")
+        def page_key(page_number: int) -> str:
+            return _page_cache_key(page_base, _source_identity(image_files[page_number]))
 
-    return _process_pages(dir_path.name, markdown_path, total_pages, start_page, file_mode, get_image_bytes)
+        return _process_pages(dir_path.name, dir_path, markdown_path, total_pages, start_page, file_mode, submit_render,
+                              page_key if LLM_CACHE else None)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
 
 
 def _select_model() -> None:
@@ -913,25 +1693,59 @@ def _main_inner(datos_dir: Path) -> None:
         f"Se encontraron {len(pdf_files)} PDF(s) y {len(image_dirs)} directorio(s) con imágenes ({total} proyecto(s) en total).")
     print("Pulsa Escape en cualquier momento para detener el procesamiento o S para omitir una página.\n")
 
-    listener = threading.Thread(target=_keyboard_listener, daemon=True)
+    # Pipe para despertar al listener de teclado cuando termine el procesamiento
+    wake_r, wake_w = os.pipe()
+    listener = threading.Thread(target=_keyboard_listener, args=(wake_r,), daemon=True)
     listener.start()
+    ticker = threading.Thread(target=_status_ticker, daemon=True)
+    if FILE_CONCURRENCY == 1:
+        ticker.start()
 
     total_elapsed = 0.0
+    # Proyectos en el orden de siempre: primero los PDFs y después los directorios de imágenes
+    jobs: list[tuple[Callable[[Path, Path], float], Path]] = (
+        [(convert_pdf_to_images, pdf_path) for pdf_path in pdf_files]
+        + [(process_image_dir, dir_path) for dir_path in image_dirs]
+    )
 
-    for pdf_path in pdf_files:
-        if stop_requested.is_set():
-            break
-        total_elapsed += convert_pdf_to_images(pdf_path, pdf_path.parent)
-
-    for dir_path in image_dirs:
-        if stop_requested.is_set():
-            break
-        total_elapsed += process_image_dir(dir_path, dir_path.parent)
-
-    # Restaurar el terminal si el listener sigue vivo (salida normal)
-    if not stop_requested.is_set():
-        _listener_exit.set()
-    listener.join(timeout=1)
+    if FILE_CONCURRENCY == 1:
+        for process, path in jobs:
+            if stop_requested.is_set():
+                break
+            total_elapsed += process(path, path.parent)
+    else:
+        # Proyectos que escriben en el mismo Markdown (foo.pdf junto a foo/, o "a b.pdf"
+        # junto a a_b.pdf) van en la misma tarea, uno tras otro, para no mezclar sus
+        # páginas. Se agrupa sin distinguir mayúsculas por los sistemas de ficheros
+        # que no las distinguen
+        groups: dict[str, list[tuple[Callable[[Path, Path], float], Path]]] = {}
+        for process, path in jobs:
+            name = path.stem if process is convert_pdf_to_images else path.name
+            markdown_path = path.parent / f"{slugify(name)}.md"
+            groups.setdefault(str(markdown_path).lower(), []).append((process, path))
+
+        def run_group(group: list[tuple[Callable[[Path, Path], float], Path]]) -> None:
+            for process, path in group:
+                if stop_requested.is_set():
+                    break
+                process(path, path.parent)
+
+        # Los proyectos se solapan: el tiempo total es el real transcurrido, no la suma
+        t_start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=FILE_CONCURRENCY) as file_pool:
+            for future in [file_pool.submit(run_group, group) for group in groups.values()]:
+                future.result()
+        total_elapsed = time.monotonic() - t_start
+
+    # Restaurar el terminal si el listener sigue vivo (salida normal) y detener el ticker
+    _listener_exit.set()
+    os.write(wake_w, b"x")
+    listener.join(timeout=2)
+    if ticker.is_alive():
+        ticker.join(timeout=2)
+    os.close(wake_w)
+    if not listener.is_alive():
+        os.close(wake_r)
 
     if stop_requested.is_set():
         print("\nProcesamiento detenido por el usuario.")
@@ -945,6 +1759,13 @@ def _main_inner(datos_dir: Path) -> None:
         print(f"  Tokens de salida (completion): {ct:,}")
         print(f"  Tokens totales:                {pt + ct:,}")
 
+    # Resumen de la caché de respuestas
+    with _cache_lock:
+        hits = _cache_hits
+        misses = _cache_misses
+    if hits or misses:
+        print(f"  Caché de respuestas:           {hits:,} acierto(s), {misses:,} fallo(s)")
+
     if total_elapsed > 0:
         print()
         print(f"  Tiempo total de procesamiento: {_fmt(total_elapsed)}")
@@ -953,4 +1774,6 @@ def _main_inner(datos_dir: Path) -> None:
 
 
 if __name__ == "__main__":
+    # Necesario para que el pool de renderizado funcione en el ejecutable de PyInstaller
+    multiprocessing.freeze_support()
     main()